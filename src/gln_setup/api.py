@@ -0,0 +1,199 @@
+"""
+In-process interface for the gln to check and set up the environment
+without going through the cli.
+
+check() and plan() only read state; apply() is the only call that changes
+anything. Dependency and git results of check() are memoized for the life
+of the process, use clear_cache() after changing the system from elsewhere.
+ssh keys are always current; KeyIndex re-reads them when they change.
+"""
+
+import shutil
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from .dependencySetup import Dependency, default_dependencies
+from .gitSetup import GitInfo
+from .historySetup import History
+from .sshSetup import KeyIndex
+
+
+@dataclass(frozen=True)
+class DependencyStatus:
+    name: str
+    installed: bool
+    path: Optional[str] = None
+    packageManagers: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class GitStatus:
+    installed: bool
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+    @property
+    def configured(self) -> bool:
+        return self.installed and bool(self.name) and bool(self.email)
+
+
+@dataclass(frozen=True)
+class KeyStatus:
+    key_path: Path
+    protocol: str
+    fingerprint: str
+    comment: str = ""
+    hosts: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class SSHStatus:
+    keys: tuple[KeyStatus, ...] = ()
+
+    @property
+    def github(self) -> bool:
+        return any(
+            "github.com" in host for key in self.keys for host in key.hosts
+        )
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    dependencies: tuple[DependencyStatus, ...]
+    git: GitStatus
+    ssh: SSHStatus
+
+    @property
+    def missing(self) -> tuple[str, ...]:
+        return tuple(d.name for d in self.dependencies if not d.installed)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and self.git.configured
+
+
+@dataclass(frozen=True)
+class Step:
+    action: str  # "install-dependency" | "set-git-name" | "set-git-email"
+    target: str
+    detail: str = ""
+
+
+@dataclass
+class ApplyResult:
+    done: list[Step] = field(default_factory=list)
+    failed: list[tuple[Step, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def _dependency_status(dependency: Dependency) -> DependencyStatus:
+    return DependencyStatus(
+        name=dependency.name,
+        installed=dependency.is_installed,
+        path=shutil.which(dependency.name),
+        packageManagers=tuple(pm.name for pm in dependency.packageManagers),
+    )
+
+
+@cache
+def check_dependencies() -> tuple[DependencyStatus, ...]:
+    return tuple(_dependency_status(d) for d in default_dependencies())
+
+
+@cache
+def check_git(file: Optional[Path] = None) -> GitStatus:
+    gi = GitInfo(file)
+    if not gi.installed:
+        return GitStatus(installed=False)
+    return GitStatus(installed=True, name=gi.name or None,
+                     email=gi.email or None)
+
+
+def check_ssh(sshDir: Path = Path("~/.ssh")) -> SSHStatus:
+    return SSHStatus(
+        keys=tuple(
+            KeyStatus(
+                key_path=k.key_path,
+                protocol=k.protocol,
+                fingerprint=k.fingerprint,
+                comment=k.comment,
+                hosts=tuple(k.hosts),
+            )
+            for k in KeyIndex.load(sshDir).keys
+        )
+    )
+
+
+def check(
+    gitFile: Optional[Path] = None, sshDir: Path = Path("~/.ssh")
+) -> CheckResult:
+    return CheckResult(
+        dependencies=check_dependencies(),
+        git=check_git(gitFile),
+        ssh=check_ssh(sshDir),
+    )
+
+
+def clear_cache() -> None:
+    check_dependencies.cache_clear()
+    check_git.cache_clear()
+
+
+def plan(result: Optional[CheckResult] = None) -> list[Step]:
+    if result is None:
+        result = check()
+    steps = [
+        Step(
+            "install-dependency",
+            d.name,
+            "via " + ", ".join(d.packageManagers),
+        )
+        for d in result.dependencies
+        if not d.installed
+    ]
+    if not result.git.name:
+        steps.append(Step("set-git-name", "user.name"))
+    if not result.git.email:
+        steps.append(Step("set-git-email", "user.email"))
+    return steps
+
+
+def apply(
+    steps: Optional[list[Step]] = None,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    gitFile: Optional[Path] = None,
+) -> ApplyResult:
+    if steps is None:
+        steps = plan(check(gitFile))
+    dependencies = {d.name: d for d in default_dependencies()}
+    history = History()
+    result = ApplyResult()
+    for step in steps:
+        try:
+            if step.action == "install-dependency":
+                dependency = dependencies[step.target]
+                dependency.install(history)
+                if not dependency.is_installed:
+                    raise RuntimeError(f"{step.target} was not installed.")
+            elif step.action == "set-git-name":
+                if name is None:
+                    raise ValueError("name is required to set user.name")
+                GitInfo(gitFile).set_name(name)
+            elif step.action == "set-git-email":
+                if email is None:
+                    raise ValueError("email is required to set user.email")
+                GitInfo(gitFile).set_email(email)
+            else:
+                raise ValueError(f"unknown action: {step.action}")
+        except Exception as e:
+            result.failed.append((step, str(e)))
+        else:
+            result.done.append(step)
+    clear_cache()
+    return result
@@ -1,12 +1,26 @@
+import time
 from pathlib import Path
 from subprocess import CalledProcessError, run
 from typing import Annotated, Optional
 
 import typer
 
-from .dependencySetup import install_dependencies
-from .gitSetup import GitInfo
-from .sshSetup import SSHkey
+from .dependencySetup import (
+    benchmark_backends,
+    default_dependencies,
+    install_dependencies,
+)
+from .gitSetup import (
+    GitInfo,
+    GitProfile,
+    benchmark_status,
+    profile_settings,
+)
+from .exportSetup import ExportFormat, Recipe
+from .fleetSetup import GLN_SETUP_URL, Fleet, read_hostfile, report
+from .glnSetup import InstalledTool, Source, gln_sources
+from .historySetup import History, plan_text
+from .sshSetup import KeyIndex, SSHkey
 
 app = typer.Typer()
 
@@ -47,7 +61,36 @@ def git(
         Optional[Path],
         typer.Option(hidden=True),
     ] = None,
+    profile: Annotated[
+        Optional[GitProfile],
+        typer.Option(
+            help=(
+                "apply tuned global settings (e.g. 'performance' for large "
+                "datalad/annex datasets)."
+            )
+        ),
+    ] = None,
+    benchmark: Annotated[
+        Optional[int],
+        typer.Option(
+            help=(
+                "time `git status` on a synthetic repo with this many files "
+                "before and after applying the profile."
+            )
+        ),
+    ] = None,
+    path: Annotated[
+        Optional[Path],
+        typer.Option(
+            help=(
+                "where your datasets live, used to detect network "
+                "filesystems. default: current directory."
+            )
+        ),
+    ] = None,
 ) -> None:
+    if benchmark is not None and profile is None:
+        raise typer.BadParameter("--benchmark requires --profile.")
     gi = GitInfo(file)
     if not gi.installed:
         raise RuntimeError("git was not found on system.")
@@ -55,13 +98,69 @@ def git(
         gi.set_name(name, force)
     if email is not None:
         gi.set_email(email, force)
+    if profile is not None:
+        for key in gi.apply_profile(profile, force, path):
+            print(f"{key}={gi.get(key)}")
+        if benchmark is not None:
+            before, after = benchmark_status(
+                profile_settings(profile, path), benchmark
+            )
+            print(
+                f"git status on {benchmark} files: "
+                f"{before:.3f}s before, {after:.3f}s after"
+            )
 
 
 @app.command()
 def install_deps(
     ctx: typer.Context,  # is this needed?
+    plan: Annotated[
+        bool,
+        typer.Option(
+            "--plan/",
+            help=(
+                "show the package managers that would be tried, in order, "
+                "with an estimated duration and exit."
+            ),
+        ),
+    ] = False,
 ) -> None:
-    install_dependencies()
+    history = History()
+    if plan:
+        print(plan_text(default_dependencies(), history))
+        return
+    install_dependencies(history=history)
+
+
+@app.command()
+def conda_benchmark(
+    ctx: typer.Context,
+    specs: Annotated[
+        list[str],
+        typer.Argument(help="packages to solve for (e.g. git-annex rclone)."),
+    ],
+    channel: Annotated[
+        str,
+        typer.Option(
+            help="channel to solve against, e.g. a local file:// one."
+        ),
+    ] = "conda-forge",
+) -> None:
+    """
+    Time a dry-run solve of specs with every conda backend found
+    (micromamba, mamba, conda).
+    """
+    times = benchmark_backends(specs, channel)
+    if not times:
+        raise RuntimeError("no conda backend was found on system.")
+    baseline = times.get("conda")
+    for backend, seconds in times.items():
+        speedup = (
+            f" ({baseline / seconds:.1f}x conda)"
+            if baseline is not None and backend != "conda"
+            else ""
+        )
+        print(f"{backend}: {seconds:.2f}s{speedup}")
 
 
 # TODO: Need enum for key gen protocol
@@ -94,15 +193,132 @@ def ssh_key(
             "-p", help="set a passphrase for the key. default: no passphrase."
         ),
     ] = "",
+    reuse: Annotated[
+        bool,
+        typer.Option(
+            "--reuse/",
+            help="use the existing key of the same name instead of failing.",
+        ),
+    ] = False,
 ) -> None:
     key = SSHkey(name=name, protocol=protocol,
                  comment=name, passphrase=passphrase)
-    key.create()
+    key.create(reuse=reuse)
     if target is not None:
         key.add_to_config(target)
         key.send_to_server(target)
 
 
+@app.command()
+def ssh_key_list(
+    ctx: typer.Context,
+    sshDir: Annotated[
+        Path,
+        typer.Option("--ssh-dir", help="directory holding the ssh-keys."),
+    ] = Path("~/.ssh"),
+) -> None:
+    """
+    List the public keys in the ssh directory with their fingerprints and
+    the hosts in the ssh config that use them.
+    """
+    index = KeyIndex.load(sshDir)
+    duplicates = index.duplicates()
+    for record in index.keys:
+        hosts = ", ".join(record.hosts) if record.hosts else "-"
+        flag = " (duplicate)" if record.fingerprint in duplicates else ""
+        print(
+            f"{record.key_path}\t{record.protocol}\t"
+            f"{record.fingerprint}\t{hosts}{flag}"
+        )
+
+
+@app.command()
+def export(
+    ctx: typer.Context,
+    format: Annotated[
+        ExportFormat,
+        typer.Option("--format", "-f", help="recipe type to write."),
+    ] = ExportFormat.dockerfile,
+    output: Annotated[
+        Optional[Path],
+        typer.Option("--output", "-o", help="file to write. default: stdout"),
+    ] = None,
+    python: Annotated[
+        str, typer.Option("--python", "-p", help="Python version, (e.g. 3.12)")
+    ] = "3.12",
+    base: Annotated[
+        str, typer.Option(help="base image (debian based).")
+    ] = "debian:bookworm-slim",
+    source: Annotated[
+        Optional[str],
+        typer.Option(help="uv install source for gln. default: github."),
+    ] = None,
+    platform: Annotated[
+        Optional[str],
+        typer.Option(help="target platform (e.g. linux/amd64)."),
+    ] = None,
+) -> None:
+    """
+    Write a container recipe that installs the same dependencies as
+    install-deps and gln as gln-install would.
+    """
+    text = Recipe(
+        base=base, python=python, source=source, platform=platform
+    ).render(format)
+    if output is None:
+        print(text, end="")
+    else:
+        output.write_text(text)
+
+
+@app.command()
+def fleet(
+    ctx: typer.Context,
+    hostfile: Annotated[
+        Path,
+        typer.Argument(
+            help="file with one host (e.g. jdoe@foo.edu) per line."
+        ),
+    ],
+    args: Annotated[
+        list[str],
+        typer.Argument(
+            help="gln-setup command to run on each host, after '--'."
+        ),
+    ],
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", help="hosts to run at once.")
+    ] = 8,
+    logDir: Annotated[
+        Path, typer.Option("--log-dir", help="directory for per-host logs.")
+    ] = Path("gln-fleet-logs"),
+    install: Annotated[
+        bool,
+        typer.Option(
+            "--install/",
+            help="(re)install gln-setup on each host before running.",
+        ),
+    ] = False,
+    source: Annotated[
+        str, typer.Option(help="where hosts install gln-setup from.")
+    ] = GLN_SETUP_URL,
+) -> None:
+    """
+    Run a gln-setup command on many hosts over ssh, e.g.
+    `gln-setup fleet hosts.txt -- install-deps`.
+    """
+    results = Fleet(
+        read_hostfile(hostfile),
+        jobs=jobs,
+        logDir=logDir,
+        install=install,
+        source=source,
+    ).run(args)
+    print(report(results))
+    if not all(r.ok for r in results):
+        raise typer.Exit(1)
+
+
 @app.command()
 def gln_install(
     ctx: typer.Context,
@@ -113,6 +329,14 @@ def gln_install(
     python: Annotated[
         str, typer.Option("--python", "-p", help="Python version, (e.g. 3.12)")
     ] = "3.12",
+    force: Annotated[
+        bool,
+        typer.Option(
+            "--force/",
+            "-f/",
+            help="reinstall even if the installed gln is up to date.",
+        ),
+    ] = False,
 ) -> None:
     """
     An ssh-key to a github account with access to TheRealGambleLab must be
@@ -128,33 +352,36 @@ def gln_install(
         python,
     ]
 
-    try:
-        run(
-            cmd
-            + [
-                f"git+ssh://{username}@{username}.hpc.einsteinmed.edu/gs/"
-                "gsfs0/users/Gamble%20Lab/ria/gamblelab/27b/"
-                "f579f-abbb-44c7-9df2-f7af88306267#egg=gln[extensions]"
-            ],
-            check=True,
-        )
-    except CalledProcessError:
-        try:
-            run(
-                cmd
-                + [
-                    "git+file:///gs/gsfs0/users/Gamble%20Lab/ria/gamblelab/"
-                    "27b/f579f-abbb-44c7-9df2-f7af88306267"
-                    "#egg=gln[on-hpc-extensions]"
-                ],
-                check=True,
+    start = time.perf_counter()
+    tool = InstalledTool()
+    sources = [Source(s) for s in gln_sources(username)]
+    for i, source in enumerate(sources):
+        last = i == len(sources) - 1
+        if source.absent and not last:
+            continue  # e.g. the RIA store is not mounted on this machine
+        head = source.head()
+        # with an unknown head there is nothing to compare, reinstall.
+        reinstall = force or head is None
+        extra = ["--reinstall"] if reinstall else []
+        action = "install" if reinstall else tool.action(source, head, python)
+        if action == "skip":
+            print(
+                f"gln is up to date ({head}) from {source.spec}, "
+                f"checked in {time.perf_counter() - start:.1f}s"
             )
+            return
+        try:
+            if action == "upgrade":
+                run(["uv", "tool", "upgrade", tool.name], check=True)
+            else:
+                run(cmd + extra + [source.spec], check=True)
         except CalledProcessError:
-            run(
-                cmd
-                + [
-                    "git+ssh://git@github.com/TheRealGambleLab"
-                    "/gln#egg=gln[extensions]"
-                ],
-                check=True,
-            )
+            if last:
+                raise
+            continue
+        done = "upgraded in place" if action == "upgrade" else "installed"
+        print(
+            f"gln {done} from {source.spec} "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        return
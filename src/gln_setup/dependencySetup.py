@@ -4,10 +4,15 @@ import shutil
 import sys
 import os
 from dataclasses import dataclass, field
+from functools import cached_property
 from subprocess import run, CalledProcessError, PIPE, DEVNULL
 import json
-from typing import Optional, Protocol
-import urllib
+import tarfile
+import time
+from typing import ClassVar, Optional, Protocol
+import urllib.request
+
+from .historySetup import History
 
 
 class PackageManager(Protocol):
@@ -28,21 +33,35 @@ class Dependency(Protocol):
         default_factory=lambda: [AptGet(), Brew(), Pipx(), Conda()]
     )
     name: str
+    # set when install does its own steps besides the package managers,
+    # so the install history cannot estimate it.
+    custom_install: ClassVar[bool] = False
 
     @property
     def is_installed(self) -> bool:
         return bool(shutil.which(self.name))
 
-    def install(self) -> None:
+    def install(self, history: Optional[History] = None) -> None:
         if self.is_installed:
             return
-        for pm in self.packageManagers:
+        managers = (
+            self.packageManagers
+            if history is None
+            else history.order(self.name, self.packageManagers)
+        )
+        for pm in managers:
+            start = time.perf_counter()
             try:
                 pm.install_app(self.name)
-                if self.is_installed:
-                    return
             except (CalledProcessError, FileNotFoundError):
                 pass
+            success = self.is_installed
+            if history is not None:
+                history.record(
+                    self.name, pm.name, success, time.perf_counter() - start
+                )
+            if success:
+                return
 
 
 @dataclass
@@ -50,11 +69,100 @@ class Conda(PackageManager):
     name: str = "conda"
     env_name: str = "gln-managed"
     python_version: str = "3.12"
+    # fastest first. conda itself is only used when neither mamba is found.
+    backends: tuple[str, ...] = ("micromamba", "mamba", "conda")
+    micromamba_path: Path = Path("~/.local/bin/micromamba")
+    root_prefix: Path = Path("~/micromamba")
+
+    @property
+    def executable(self) -> Optional[str]:
+        for backend in self.backends:
+            found = shutil.which(backend)
+            if found is None and backend == "micromamba":
+                bootstrapped = self.micromamba_path.expanduser()
+                found = str(bootstrapped) if bootstrapped.exists() else None
+            if found is not None:
+                return found
+        return None
+
+    @property
+    def backend(self) -> Optional[str]:
+        exe = self.executable
+        return None if exe is None else Path(exe).name
+
+    @property
+    def is_pm_installed(self) -> bool:
+        return self.executable is not None
+
+    @cached_property
+    def solver_args(self) -> list[str]:
+        """
+        conda>=23.10 already solves with libmamba; between 22.11 and 23.10
+        it has to be asked for, if the solver plugin is installed.
+        """
+        if self.backend != "conda":
+            return []
+        try:
+            version = run(
+                [self.cmd[0], "--version"],
+                check=True,
+                text=True,
+                capture_output=True,
+            ).stdout.split()[-1]
+            major, minor = (int(v) for v in version.split(".")[:2])
+        except (CalledProcessError, ValueError, IndexError):
+            return []
+        if (22, 11) <= (major, minor) < (23, 10) and self.has_libmamba:
+            return ["--solver=libmamba"]
+        return []
+
+    @property
+    def has_libmamba(self) -> bool:
+        try:
+            return bool(
+                json.loads(
+                    run(
+                        self.cmd
+                        + [
+                            "list",
+                            "-n",
+                            "base",
+                            "conda-libmamba-solver",
+                            "--json",
+                        ],
+                        check=True,
+                        capture_output=True,
+                    ).stdout
+                )
+            )
+        except (CalledProcessError, json.JSONDecodeError):
+            return False
+
+    @property
+    def cmd(self) -> list[str]:
+        exe = self.executable
+        if exe is None:
+            raise FileNotFoundError("no conda backend found.")
+        return [exe]
+
+    @property
+    def env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        if self.backend == "micromamba":
+            env.setdefault(
+                "MAMBA_ROOT_PREFIX", str(self.root_prefix.expanduser())
+            )
+        return env
 
     @property
     def is_initialized(self) -> bool:
         bashrcText = Path("~/.bashrc").expanduser().read_text()
-        return "# >>> conda initialize >>>" in bashrcText.splitlines()
+        marker = (
+            "# >>> mamba initialize >>>"
+            if self.backend == "micromamba"
+            else "# >>> conda initialize >>>"
+        )
+        return marker in bashrcText.splitlines()
 
     @property
     def is_env_installed(self) -> bool:
@@ -66,9 +174,10 @@ class Conda(PackageManager):
             e
             for e in json.loads(
                 run(
-                    [self.name, "env", "list", "--json"],
+                    self.cmd + ["env", "list", "--json"],
                     check=True,
                     capture_output=True,
+                    env=self.env,
                 ).stdout
             )["envs"]
             if Path(e).name == self.env_name
@@ -81,48 +190,64 @@ class Conda(PackageManager):
     def install(self) -> None:
         if self.is_pm_installed:
             return
-        downloadCmd = (
-            [
-                "wget",
-                "https://repo.anaconda.com/miniconda"
-                "/Miniconda3-latest-Linux-x86_64.sh",
-                "-O",
-                "~/miniconda3/miniconda.sh",
-            ]
-            if platform.system().lower() == "linux"
-            else [
-                "curl",
-                "https://repo.anaconda.com/miniconda/"
-                "Miniconda3-latest-MacOSX-arm64.sh",
-                "-o",
-                "~/miniconda3/miniconda.sh",
-            ]
-        )
-        Path("~/miniconda3").expanduser().mkdir(parents=True, exist_ok=True)
-        run(
-            downloadCmd,
-            check=True,
-        )
-        run(
-            [
-                "bash",
-                "~/miniconda3/miniconda.sh",
-                "-b",
-                "-u",
-                "-p,",
-                "~/miniconda3",
-            ],
-            check=True,
-        )
-        Path("~/miniconda3/miniconda.sh").expanduser().unlink(missing_ok=True)
-        # warn("conda installed. You must reopen your terminal or run "
-        # "`source ~/miniconda3/bin/activate` from the shell to continue")
-        # I think because each subprocess is a new shell this is ok?
+        # a standalone micromamba is a single static binary, much smaller
+        # and faster to set up than the full miniconda installer.
+        system = platform.system().lower()
+        machine = platform.machine().lower()
+        arch = {
+            ("linux", "x86_64"): "linux-64",
+            ("linux", "aarch64"): "linux-aarch64",
+            ("linux", "ppc64le"): "linux-ppc64le",
+            ("darwin", "x86_64"): "osx-64",
+            ("darwin", "arm64"): "osx-arm64",
+        }.get((system, machine))
+        if arch is None:
+            raise FileNotFoundError(
+                f"micromamba is not available for {system}-{machine}."
+            )
+        target = self.micromamba_path.expanduser()
+        # written beside the target and moved in place once complete, so
+        # an interrupted download never leaves a binary `executable` finds.
+        partial = target.with_name(target.name + ".partial")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with urllib.request.urlopen(
+                f"https://micro.mamba.pm/api/micromamba/{arch}/latest"
+            ) as response:
+                with tarfile.open(fileobj=response, mode="r|bz2") as tar:
+                    for member in tar:
+                        if member.name == "bin/micromamba":
+                            source = tar.extractfile(member)
+                            if source is not None:
+                                partial.write_bytes(source.read())
+                            break
+            if not partial.exists():
+                raise FileNotFoundError("bin/micromamba not in archive")
+            partial.chmod(0o755)
+            partial.replace(target)
+        except (OSError, tarfile.TarError) as e:
+            partial.unlink(missing_ok=True)
+            raise FileNotFoundError(f"micromamba download failed: {e}")
         self.init()
 
     def init(self) -> None:
+        if self.backend == "micromamba":
+            run(
+                self.cmd
+                + [
+                    "shell",
+                    "init",
+                    "-s",
+                    "bash",
+                    "-r",
+                    self.env["MAMBA_ROOT_PREFIX"],
+                ],
+                check=True,
+                env=self.env,
+            )
+            return
         run(
-            [self.name, "init"],
+            self.cmd + ["init"],
             check=True,
         )
 
@@ -130,14 +255,19 @@ class Conda(PackageManager):
         if self.is_env_installed:
             return
         run(
-            [
-                self.name,
+            self.cmd
+            + [
                 "create",
+                "-y",
+                "-c",
+                "conda-forge",
                 "-n",
                 self.env_name,
                 "python=" + self.python_version,
-            ],
+            ]
+            + self.solver_args,
             check=True,
+            env=self.env,
         )
 
     def add_env_to_PATH(self) -> None:
@@ -155,8 +285,8 @@ class Conda(PackageManager):
         self.install()
         self.install_env()
         run(
-            [
-                self.name,
+            self.cmd
+            + [
                 "install",
                 "-c",
                 "conda-forge",
@@ -164,8 +294,10 @@ class Conda(PackageManager):
                 "-n",
                 self.env_name,
                 app_name,
-            ],
+            ]
+            + self.solver_args,
             check=True,
+            env=self.env,
         )
         if not bool(shutil.which(app_name)):
             self.add_env_to_PATH()
@@ -174,6 +306,40 @@ class Conda(PackageManager):
                     f"{app_name} was not properly installed by conda."
                 )
 
+    def solve_time(
+        self, specs: list[str], channel: str = "conda-forge"
+    ) -> float:
+        """
+        Seconds taken to solve (not install) a fresh env with specs.
+        """
+        start = time.perf_counter()
+        run(
+            self.cmd
+            + ["create", "-y", "--dry-run", "-n", self.env_name + "-solve"]
+            + ["--override-channels", "-c", channel]
+            + specs
+            + self.solver_args,
+            check=True,
+            capture_output=True,
+            env=self.env,
+        )
+        return time.perf_counter() - start
+
+
+def benchmark_backends(
+    specs: list[str], channel: str = "conda-forge"
+) -> dict[str, float]:
+    """
+    Solve time of specs from channel for every conda backend on this
+    machine, e.g. against a local channel to compare solvers.
+    """
+    times = {}
+    for backend in Conda.backends:
+        conda = Conda(backends=(backend,))
+        if conda.backend == backend:
+            times[backend] = conda.solve_time(specs, channel)
+    return times
+
 
 class AptGet(PackageManager):
     name: str = "apt-get"
@@ -202,10 +368,10 @@ class Pipx(PackageManager, Dependency):
         default_factory=lambda: [Conda(), AptGet(), Brew()]
     )
 
-    def install(self) -> None:
+    def install(self, history: Optional[History] = None) -> None:
         if self.is_installed:
             return
-        super().install()
+        super().install(history)
         self.ensurepath()
 
     def ensurepath(self) -> None:
@@ -225,9 +391,10 @@ class Pipx(PackageManager, Dependency):
 class Uv(PackageManager, Dependency):
     name: str = "uv"
     packageManagers: list[PackageManager] = field(default_factory=list)
+    custom_install: ClassVar[bool] = True
     python_version: str = "3.12"
 
-    def install(self) -> None:
+    def install(self, history: Optional[History] = None) -> None:
         if self.is_installed:
             return
         with urllib.request.urlopen(
@@ -297,8 +464,9 @@ class GitHubCli(Dependency):
     packageManagers: list[PackageManager] = field(
         default_factory=lambda: [AptGet(), Brew(), Conda()]
     )
+    custom_install: ClassVar[bool] = True
 
-    def install(self):
+    def install(self, history: Optional[History] = None):
         if AptGet().is_pm_installed:
             run(
                 ["sudo", "mkdir", "-p", "-m", "755", "/etc/apt/keyrings"],
@@ -357,7 +525,7 @@ class GitHubCli(Dependency):
                 ["sudo", "apt", "update"],
                 check=True,
             )
-        super().install()
+        super().install(history)
 
 
 @dataclass
@@ -387,8 +555,8 @@ class Pdm(Dependency):
     )
 
 
-def install_dependencies(
-    dependencies: list[Dependency] = [
+def default_dependencies() -> list[Dependency]:
+    return [
         P7zip(),
         Git(),
         GitAnnex(),
@@ -397,7 +565,14 @@ def install_dependencies(
         Wget(),
         GitHubCli(),
         Uv(),
-    ],
+    ]
+
+
+def install_dependencies(
+    dependencies: Optional[list[Dependency]] = None,
+    history: Optional[History] = None,
 ) -> None:
+    if dependencies is None:
+        dependencies = default_dependencies()
     for dependency in dependencies:
-        dependency.install()
+        dependency.install(history)
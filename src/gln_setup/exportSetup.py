@@ -0,0 +1,183 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+from .dependencySetup import (
+    AptGet,
+    Dependency,
+    GitHubCli,
+    PackageManager,
+    Uv,
+    default_dependencies,
+)
+from .glnSetup import gln_sources
+
+GH_KEYRING = "/etc/apt/keyrings/githubcli-archive-keyring.gpg"
+UV_INSTALL_URL = "https://astral.sh/uv/install.sh"
+
+
+class ExportFormat(str, Enum):
+    dockerfile = "dockerfile"
+    apptainer = "apptainer"
+
+
+@dataclass
+class Recipe:
+    """
+    The resolved setup plan as shell layers, ordered from least to most
+    likely to change so rebuilds reuse cached layers.
+    """
+
+    base: str = "debian:bookworm-slim"
+    python: str = "3.12"
+    source: Optional[str] = None
+    platform: Optional[str] = None
+    dependencies: list[Dependency] = field(
+        default_factory=default_dependencies
+    )
+
+    @property
+    def install_source(self) -> str:
+        if self.source is not None:
+            return self.source
+        # the hpc sources need a user and the cluster filesystem, only the
+        # github source is reachable from a build.
+        return gln_sources()[-1]
+
+    @property
+    def apt_packages(self) -> list[str]:
+        return sorted(
+            d.name
+            for d in self.dependencies
+            if not isinstance(d, (Uv, GitHubCli))
+            and _has_manager(d.packageManagers, AptGet)
+        )
+
+    @property
+    def needs_gh(self) -> bool:
+        return any(isinstance(d, GitHubCli) for d in self.dependencies)
+
+    @property
+    def system_layer(self) -> list[str]:
+        cmds = [
+            "apt-get update",
+            "apt-get install -y --no-install-recommends "
+            "ca-certificates curl git openssh-client",
+        ]
+        if self.needs_gh:
+            cmds += [
+                "mkdir -p -m 755 /etc/apt/keyrings",
+                "curl -fsSL https://cli.github.com/packages/"
+                f"githubcli-archive-keyring.gpg -o {GH_KEYRING}",
+                f"chmod go+r {GH_KEYRING}",
+                'echo "deb [arch=$(dpkg --print-architecture) '
+                f'signed-by={GH_KEYRING}] '
+                'https://cli.github.com/packages stable main" '
+                "> /etc/apt/sources.list.d/github-cli.list",
+                "apt-get update",
+            ]
+        packages = self.apt_packages + (["gh"] if self.needs_gh else [])
+        cmds += [
+            "apt-get install -y --no-install-recommends " + " ".join(packages),
+            "rm -rf /var/lib/apt/lists/*",
+        ]
+        return cmds
+
+    @property
+    def uv_layer(self) -> list[str]:
+        return [
+            f"curl -LsSf {UV_INSTALL_URL} "
+            "| env UV_INSTALL_DIR=/usr/local/bin UV_NO_MODIFY_PATH=1 sh",
+            f"uv python install {self.python}",
+        ]
+
+    @property
+    def gln_layer(self) -> list[str]:
+        return [
+            "mkdir -p -m 700 ~/.ssh",
+            "ssh-keyscan github.com >> ~/.ssh/known_hosts",
+            f"uv tool install --python {self.python} "
+            f"'{self.install_source}'",
+        ]
+
+    @property
+    def env(self) -> dict[str, str]:
+        return {
+            "UV_PYTHON_INSTALL_DIR": "/opt/uv/python",
+            "UV_TOOL_DIR": "/opt/uv/tools",
+            "UV_TOOL_BIN_DIR": "/usr/local/bin",
+        }
+
+    def to_dockerfile(self) -> str:
+        platform = (
+            "" if self.platform is None else f"--platform={self.platform} "
+        )
+        lines = [
+            "# syntax=docker/dockerfile:1",
+            f"FROM {platform}{self.base}",
+            "ARG DEBIAN_FRONTEND=noninteractive",
+            "ENV "
+            + " \\\n    ".join(f"{k}={v}" for k, v in self.env.items()),
+            "",
+            "# system packages",
+            "RUN " + _join(self.system_layer),
+            "",
+            "# uv toolchain",
+            "RUN " + _join(self.uv_layer),
+            "",
+            "# gln (build with `docker build --ssh default .`)",
+            "RUN --mount=type=ssh " + _join(self.gln_layer),
+            "",
+        ]
+        return "\n".join(lines)
+
+    def to_apptainer(self) -> str:
+        if self.platform is not None:
+            raise ValueError(
+                "apptainer builds for the host platform, drop --platform."
+            )
+        if self.source is None:
+            # %post has no ssh agent to reach the private github repo.
+            raise ValueError(
+                "apptainer builds cannot use your ssh-key, pass --source "
+                "(e.g. a wheel or checkout under a %files path or an "
+                "https url with a token)."
+            )
+        exports = [f"export {k}={v}" for k, v in self.env.items()]
+        post = (
+            ["export DEBIAN_FRONTEND=noninteractive"]
+            + exports
+            + ["", "# system packages"]
+            + self.system_layer
+            + ["", "# uv toolchain"]
+            + self.uv_layer
+            + ["", "# gln"]
+            + self.gln_layer
+        )
+        lines = [
+            "Bootstrap: docker",
+            f"From: {self.base}",
+            "",
+            "%environment",
+            *(f"    {e}" for e in exports),
+            "",
+            "%post",
+            *(f"    {p}" if p else "" for p in post),
+            "",
+        ]
+        return "\n".join(lines)
+
+    def render(self, format: ExportFormat) -> str:
+        if format is ExportFormat.dockerfile:
+            return self.to_dockerfile()
+        return self.to_apptainer()
+
+
+def _has_manager(
+    packageManagers: list[PackageManager], kind: type
+) -> bool:
+    return any(isinstance(pm, kind) for pm in packageManagers)
+
+
+def _join(cmds: list[str]) -> str:
+    return " \\\n    && ".join(cmds)
@@ -0,0 +1,161 @@
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import DEVNULL, STDOUT, run
+from tempfile import TemporaryDirectory
+
+GLN_SETUP_URL = "git+https://github.com/TheRealGambleLab/gln-setup.git"
+# non-interactive ssh sessions often miss where uv puts its tools.
+REMOTE_PATH = 'export PATH="$HOME/.local/bin:$HOME/.cargo/bin:$PATH"; '
+
+
+def read_hostfile(path: Path) -> list[str]:
+    """
+    One host (e.g. jdoe@foo.edu) per line. Blank lines and text after a
+    '#' are ignored.
+    """
+    hosts = []
+    for line in path.expanduser().read_text().splitlines():
+        host = line.split("#", 1)[0].strip()
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
+
+@dataclass
+class HostResult:
+    host: str
+    returncode: int
+    seconds: float
+    log: Path
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+@dataclass
+class Fleet:
+    hosts: list[str]
+    jobs: int = 8
+    logDir: Path = Path("gln-fleet-logs")
+    install: bool = False
+    source: str = GLN_SETUP_URL
+    ssh: list[str] = field(default_factory=lambda: ["ssh"])
+    # every host gets several ssh calls (probe or install, then the
+    # command), these share one connection through the control master.
+    sshOptions: list[str] = field(
+        default_factory=lambda: [
+            "-o",
+            "BatchMode=yes",
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            "ControlPersist=30",
+        ]
+    )
+
+    def ssh_command(
+        self, host: str, controlDir: Path, command: str
+    ) -> list[str]:
+        return (
+            self.ssh
+            + self.sshOptions
+            + ["-o", f"ControlPath={controlDir}/%C", host, command]
+        )
+
+    def install_command(self) -> str:
+        return f"{REMOTE_PATH}uv tool install --force {self.quoted_source}"
+
+    def probe_command(self) -> str:
+        return f"{REMOTE_PATH}command -v gln-setup"
+
+    def run_command(self, args: list[str], installed: bool) -> str:
+        """
+        An installed gln-setup is used as is, otherwise it is run through
+        uvx without installing it.
+        """
+        exe = (
+            "gln-setup"
+            if installed
+            else f"uvx --from {self.quoted_source} gln-setup"
+        )
+        return f"{REMOTE_PATH}{exe} {shlex.join(args)}"
+
+    @property
+    def quoted_source(self) -> str:
+        return shlex.quote(self.source)
+
+    def run_host(
+        self, host: str, args: list[str], controlDir: Path
+    ) -> HostResult:
+        log = self.logDir / (host.replace("/", "_") + ".log")
+        start = time.perf_counter()
+        with log.open("w") as f:
+
+            def step(command: str) -> int:
+                f.write(f"$ {command}\n")
+                f.flush()
+                return run(
+                    self.ssh_command(host, controlDir, command),
+                    stdout=f,
+                    stderr=STDOUT,
+                ).returncode
+
+            try:
+                if self.install:
+                    returncode = step(self.install_command())
+                    installed = True
+                else:
+                    returncode = step(self.probe_command())
+                    installed = returncode == 0
+                    if returncode != 255:  # 255 means ssh itself failed
+                        returncode = 0
+                if returncode == 0:
+                    returncode = step(self.run_command(args, installed))
+            except OSError as e:
+                f.write(f"{e}\n")
+                returncode = 255
+            finally:
+                self.close_master(host, controlDir)
+        return HostResult(
+            host, returncode, time.perf_counter() - start, log
+        )
+
+    def close_master(self, host: str, controlDir: Path) -> None:
+        try:
+            run(
+                self.ssh
+                + ["-o", f"ControlPath={controlDir}/%C", "-O", "exit", host],
+                stdout=DEVNULL,
+                stderr=DEVNULL,
+            )
+        except OSError:
+            pass
+
+    def run(self, args: list[str]) -> list[HostResult]:
+        self.logDir.mkdir(parents=True, exist_ok=True)
+        # a private, short directory: ~/.ssh may not exist and control
+        # socket paths are limited to ~100 characters.
+        with TemporaryDirectory(prefix="gln-fleet-") as controlDir:
+            with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as pool:
+                return list(
+                    pool.map(
+                        lambda h: self.run_host(h, args, Path(controlDir)),
+                        self.hosts,
+                    )
+                )
+
+
+def report(results: list[HostResult]) -> str:
+    width = max((len(r.host) for r in results), default=4)
+    lines = [
+        f"{r.host:<{width}}  {'pass' if r.ok else 'FAIL'}  "
+        f"{r.seconds:7.1f}s  {r.log}"
+        for r in results
+    ]
+    failed = sum(not r.ok for r in results)
+    lines.append(f"{len(results) - failed} passed, {failed} failed")
+    return "\n".join(lines)
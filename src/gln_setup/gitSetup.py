@@ -1,9 +1,37 @@
+import os
+import platform
+import time
 from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
-from subprocess import STDOUT, CalledProcessError, check_output, run
+from subprocess import DEVNULL, STDOUT, CalledProcessError, check_output, run
+from tempfile import TemporaryDirectory
 from typing import Optional
 from warnings import warn
 
+NETWORK_FILESYSTEMS = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smbfs",
+    "smb3",
+    "afs",
+    "gpfs",
+    "lustre",
+    "beegfs",
+    "fuse.sshfs",
+    "9p",
+}
+
+
+# thread settings are global and shared by every node that mounts the same
+# home directory, so keep them modest.
+MAX_THREADS: int = 8
+
+
+class GitProfile(str, Enum):
+    performance = "performance"
+
 
 @dataclass
 class GitInfo:
@@ -70,3 +98,184 @@ class GitInfo:
             )
             return
         run(self.prefixCmd + ["user.email", value], check=True)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return run(
+                self.prefixCmd + [key],
+                check=True,
+                text=True,
+                capture_output=True,
+            ).stdout.strip()
+        except CalledProcessError:
+            return None
+
+    def set(self, key: str, value: str, force: bool = False) -> None:
+        current = self.get(key)
+        if current == value:
+            return
+        if current is not None and not force:
+            warn(
+                f"{key} already set to {current}. No changes made. "
+                "Use 'force' to override."
+            )
+            return
+        run(self.prefixCmd + [key, value], check=True)
+
+    def apply_profile(
+        self,
+        profile: GitProfile,
+        force: bool = False,
+        path: Optional[Path] = None,
+    ) -> dict[str, str]:
+        settings = profile_settings(profile, path)
+        for key, value in settings.items():
+            self.set(key, value, force)
+        return settings
+
+
+def filesystem_type(path: Optional[Path] = None) -> Optional[str]:
+    """
+    Return the filesystem type of the mount holding path (default: home)
+    (linux only).
+    """
+    try:
+        mounts = Path("/proc/mounts").read_text().splitlines()
+        path = (Path.home() if path is None else path).resolve()
+    except (OSError, RuntimeError):
+        return None
+    best: tuple[int, Optional[str]] = (-1, None)
+    for line in mounts:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        mountPoint = Path(fields[1].replace("\\040", " "))
+        if path.is_relative_to(mountPoint) and len(
+            mountPoint.parts
+        ) > best[0]:
+            best = (len(mountPoint.parts), fields[2])
+    return best[1]
+
+
+def usable_cpus() -> int:
+    """
+    Cores this process may run on (not the whole node), capped at
+    MAX_THREADS.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, MAX_THREADS))
+
+
+def is_network_filesystem(path: Optional[Path] = None) -> bool:
+    fsType = filesystem_type(path)
+    return fsType is not None and (
+        fsType in NETWORK_FILESYSTEMS or fsType.startswith("nfs")
+    )
+
+
+def profile_settings(
+    profile: GitProfile, path: Optional[Path] = None
+) -> dict[str, str]:
+    """
+    path is where the datasets live (default: the current directory). The
+    settings are global, so the safe values are used if either it or the
+    home directory is on a network filesystem.
+    """
+    if profile is not GitProfile.performance:
+        raise ValueError(f"unknown git profile: {profile}")
+    cpus = str(usable_cpus())
+    onNetwork = is_network_filesystem(
+        Path.cwd() if path is None else path
+    ) or is_network_filesystem()
+    settings = {
+        "feature.manyFiles": "true",
+        "core.preloadIndex": "true",
+        "index.threads": cpus,
+        "pack.threads": cpus,
+        "annex.jobs": "cpus",
+    }
+    if onNetwork:
+        # directory mtimes are unreliable on network filesystems and the
+        # fsmonitor daemon cannot watch them.
+        settings["core.untrackedCache"] = "false"
+    else:
+        settings["core.untrackedCache"] = "true"
+        # the builtin fsmonitor only exists for macOS and Windows.
+        if platform.system() in ("Darwin", "Windows"):
+            settings["core.fsmonitor"] = "true"
+    return settings
+
+
+def benchmark_status(
+    settings: dict[str, str], nFiles: int = 100_000, repeat: int = 3
+) -> tuple[float, float]:
+    """
+    Build a synthetic repository with nFiles files and return the best
+    `git status` time in seconds without and with settings applied.
+    """
+    env = dict(os.environ, GIT_CONFIG_GLOBAL=os.devnull)
+    with TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        run(["git", "init", "-q", str(repo)], check=True, env=env)
+        for i in range(nFiles):
+            subdir = repo / f"d{i // 1000:04d}"
+            subdir.mkdir(exist_ok=True)
+            (subdir / f"f{i}").write_text(str(i))
+        run(
+            ["git", "-C", str(repo), "add", "-A"],
+            check=True,
+            env=env,
+        )
+        run(
+            [
+                "git",
+                "-C",
+                str(repo),
+                "-c",
+                "user.name=gln-setup",
+                "-c",
+                "user.email=gln-setup@localhost",
+                "commit",
+                "-q",
+                "-m",
+                "benchmark",
+            ],
+            check=True,
+            env=env,
+        )
+        tuned: list[str] = []
+        for key, value in settings.items():
+            tuned += ["-c", f"{key}={value}"]
+
+        def best(extra: list[str]) -> float:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run(
+                    ["git", "-C", str(repo)] + extra + ["status"],
+                    check=True,
+                    env=env,
+                    stdout=DEVNULL,
+                )
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        before = best([])
+        # first run with the profile rewrites the index and fills caches.
+        run(
+            ["git", "-C", str(repo)] + tuned + ["update-index", "--refresh"],
+            env=env,
+            stdout=DEVNULL,
+        )
+        after = best(tuned)
+        if "core.fsmonitor" in settings:
+            run(
+                ["git", "-C", str(repo), "fsmonitor--daemon", "stop"],
+                env=env,
+                stdout=DEVNULL,
+                stderr=DEVNULL,
+            )
+    return before, after
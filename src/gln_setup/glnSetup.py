@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import CalledProcessError, TimeoutExpired, run
+from typing import Optional
+from urllib.parse import unquote
+
+RIA_PATH = (
+    "/gs/gsfs0/users/Gamble%20Lab/ria/gamblelab/"
+    "27b/f579f-abbb-44c7-9df2-f7af88306267"
+)
+GITHUB_URL = "git+ssh://git@github.com/TheRealGambleLab/gln"
+# never stop at a password or host key prompt while probing a source.
+GIT_SSH_COMMAND = "ssh -o BatchMode=yes"
+
+
+def gln_sources(username: Optional[str] = None) -> list[str]:
+    """
+    Install sources for gln in the order they should be tried.
+    """
+    return [
+        f"git+ssh://{username}@{username}.hpc.einsteinmed.edu{RIA_PATH}"
+        "#egg=gln[extensions]",
+        f"git+file://{RIA_PATH}#egg=gln[on-hpc-extensions]",
+        f"{GITHUB_URL}#egg=gln[extensions]",
+    ]
+
+
+def normalize_url(url: str) -> str:
+    """
+    Reduce a uv/pip source spec or direct_url.json url to the bare git url
+    so the two can be compared.
+    """
+    url = url.removeprefix("git+").split("#")[0]
+    head, _, last = url.rpartition("/")
+    url = head + "/" + last.split("@")[0]  # drop any @revision
+    return unquote(url).rstrip("/").removesuffix(".git")
+
+
+@dataclass
+class Source:
+    spec: str  # e.g. git+ssh://host/path#egg=gln[extensions]
+
+    @property
+    def url(self) -> str:
+        return normalize_url(self.spec)
+
+    @property
+    def extras(self) -> list[str]:
+        match = re.search(r"egg=[^\[&]+\[([^\]]*)\]", self.spec)
+        if match is None:
+            return []
+        return sorted(e.strip() for e in match.group(1).split(",") if e)
+
+    @property
+    def local_path(self) -> Optional[Path]:
+        if not self.url.startswith("file://"):
+            return None
+        return Path(self.url.removeprefix("file://"))
+
+    @property
+    def absent(self) -> bool:
+        """
+        True only when the source is known not to exist here, i.e. a
+        file:// store that is not mounted. Unreachable remotes are unknown,
+        not absent.
+        """
+        return self.local_path is not None and not self.local_path.exists()
+
+    def head(self, timeout: float = 30) -> Optional[str]:
+        """
+        Commit the source's HEAD points to, without fetching anything.
+        None when it cannot be found out.
+        """
+        if self.local_path is not None:
+            return local_head(self.local_path)
+        try:
+            out = run(
+                ["git", "ls-remote", self.url, "HEAD"],
+                check=True,
+                text=True,
+                capture_output=True,
+                timeout=timeout,
+                env=dict(os.environ, GIT_SSH_COMMAND=GIT_SSH_COMMAND),
+            ).stdout.split()
+        except (CalledProcessError, FileNotFoundError, TimeoutExpired):
+            return None
+        return out[0] if out else None
+
+
+def local_head(repo: Path) -> Optional[str]:
+    """
+    Resolve HEAD of a bare repository (e.g. an RIA store) by reading its
+    ref files directly.
+    """
+    try:
+        head = (repo / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+    ref = head.removeprefix("ref:").strip()
+    try:
+        return (repo / ref).read_text().strip()
+    except OSError:
+        pass
+    try:
+        packed = (repo / "packed-refs").read_text().splitlines()
+    except OSError:
+        return None
+    for line in packed:
+        fields = line.split()
+        if len(fields) == 2 and fields[1] == ref:
+            return fields[0]
+    return None
+
+
+@dataclass
+class InstalledTool:
+    name: str = "gln"
+    toolDir: Optional[Path] = None
+
+    def __post_init__(self):
+        if self.toolDir is None:
+            try:
+                self.toolDir = Path(
+                    run(
+                        ["uv", "tool", "dir"],
+                        check=True,
+                        text=True,
+                        capture_output=True,
+                    ).stdout.strip()
+                )
+            except (CalledProcessError, FileNotFoundError):
+                return
+
+    @property
+    def path(self) -> Optional[Path]:
+        if self.toolDir is None:
+            return None
+        return self.toolDir / self.name
+
+    @property
+    def receipt(self) -> dict:
+        if self.path is None:
+            return {}
+        try:
+            with (self.path / "uv-receipt.toml").open("rb") as f:
+                return tomllib.load(f).get("tool", {})
+        except (OSError, tomllib.TOMLDecodeError):
+            return {}
+
+    @property
+    def requirement(self) -> dict:
+        for req in self.receipt.get("requirements", []):
+            if req.get("name") == self.name:
+                return req
+        return {}
+
+    @property
+    def extras(self) -> list[str]:
+        return sorted(self.requirement.get("extras", []))
+
+    @property
+    def python(self) -> Optional[str]:
+        return self.receipt.get("python")
+
+    @property
+    def direct_url(self) -> dict:
+        if self.path is None:
+            return {}
+        for f in self.path.glob(
+            f"lib/python*/site-packages/{self.name}-*.dist-info/"
+            "direct_url.json"
+        ):
+            try:
+                return json.loads(f.read_text())
+            except (OSError, json.JSONDecodeError):
+                pass
+        return {}
+
+    @property
+    def url(self) -> Optional[str]:
+        url = self.direct_url.get("url")
+        return None if url is None else normalize_url(url)
+
+    @property
+    def commit(self) -> Optional[str]:
+        return self.direct_url.get("vcs_info", {}).get("commit_id")
+
+    def action(
+        self, source: Source, head: Optional[str], python: str
+    ) -> str:
+        """
+        'skip' when the installed tool already matches source at head,
+        'upgrade' when only the commit differs and 'install' otherwise.
+        """
+        if (
+            self.url != source.url
+            or self.extras != source.extras
+            or (self.python is not None and self.python != python)
+        ):
+            return "install"
+        if head is not None and self.commit == head:
+            return "skip"
+        return "upgrade"
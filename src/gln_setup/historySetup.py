@@ -0,0 +1,165 @@
+import json
+import os
+import platform
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from warnings import warn
+
+# used to order managers that have never been tried on this platform.
+# These are guesses, so plan_text never reports them as estimates.
+PRIOR_SECONDS: float = 60.0
+PRIOR_SUCCESS: float = 0.5
+# attempts kept per (dependency, manager, platform).
+KEEP: int = 20
+
+
+def default_history_path() -> Path:
+    state = os.environ.get("XDG_STATE_HOME", "~/.local/state")
+    return Path(state, "gln-setup", "history.json").expanduser()
+
+
+def current_platform() -> str:
+    return f"{platform.system().lower()}-{platform.machine().lower()}"
+
+
+@dataclass
+class Estimate:
+    manager: str
+    success: float
+    seconds: float
+
+    @property
+    def cost(self) -> float:
+        """
+        Expected seconds spent per unit chance of success. Trying managers
+        in increasing cost minimises the expected time to success.
+        """
+        return self.seconds / self.success
+
+
+@dataclass
+class History:
+    path: Path = field(default_factory=default_history_path)
+    platform: str = field(default_factory=current_platform)
+    attempts: dict[str, list[tuple[bool, float]]] = field(
+        init=False, default_factory=dict
+    )
+
+    def __post_init__(self):
+        self.path = self.path.expanduser()
+        try:
+            data = json.loads(self.path.read_text())
+            self.attempts = {
+                str(k): [(bool(ok), float(s)) for ok, s in v]
+                for k, v in data.items()
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, AttributeError, TypeError, ValueError):
+            # unreadable or not the expected shape: start over.
+            warn(f"ignoring unreadable install history {self.path}")
+
+    def key(self, dependency: str, manager: str) -> str:
+        return f"{dependency}|{manager}|{self.platform}"
+
+    def record(
+        self, dependency: str, manager: str, success: bool, seconds: float
+    ) -> None:
+        attempts = self.attempts.setdefault(self.key(dependency, manager), [])
+        attempts.append((success, seconds))
+        del attempts[:-KEEP]
+        self.save()
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.attempts, indent=1))
+        except OSError as e:
+            warn(f"could not save install history to {self.path}: {e}")
+
+    def known(self, dependency: str, manager: str) -> bool:
+        return bool(self.attempts.get(self.key(dependency, manager)))
+
+    def estimate(self, dependency: str, manager: str) -> Estimate:
+        attempts = self.attempts.get(self.key(dependency, manager), [])
+        if not attempts:
+            return Estimate(manager, PRIOR_SUCCESS, PRIOR_SECONDS)
+        successes = sum(ok for ok, _ in attempts)
+        # laplace smoothing keeps one failure from ruling a manager out.
+        success = (successes + 1) / (len(attempts) + 2)
+        seconds = sum(s for _, s in attempts) / len(attempts)
+        return Estimate(manager, success, max(seconds, 0.01))
+
+    def order(self, dependency: str, managers: list) -> list:
+        """
+        managers sorted by expected time-to-success. Ties (e.g. no history)
+        keep the hand-written order.
+        """
+        return sorted(
+            managers, key=lambda pm: self.estimate(dependency, pm.name).cost
+        )
+
+    def expected_seconds(self, dependency: str, managers: list) -> float:
+        """
+        Expected duration of trying managers in order until one succeeds.
+        """
+        total = 0.0
+        reach = 1.0
+        for pm in managers:
+            estimate = self.estimate(dependency, pm.name)
+            total += reach * estimate.seconds
+            reach *= 1 - estimate.success
+        return total
+
+
+def plan_text(dependencies: list, history: Optional[History] = None) -> str:
+    """
+    Only dependencies whose every manager has history get a duration, the
+    rest are listed as unknown and left out of the total.
+    """
+    if history is None:
+        history = History()
+    lines = []
+    total = 0.0
+    estimated = 0
+    noHistory = []
+    customInstall = []
+    for dependency in dependencies:
+        if dependency.is_installed:
+            lines.append(f"{dependency.name}: installed")
+            continue
+        if getattr(dependency, "custom_install", False):
+            customInstall.append(dependency.name)
+            lines.append(f"{dependency.name}: own installer (not estimated)")
+            continue
+        managers = history.order(dependency.name, dependency.packageManagers)
+        unknown = [
+            pm.name
+            for pm in managers
+            if not history.known(dependency.name, pm.name)
+        ]
+        order = " -> ".join(
+            pm.name + (" (no history)" if pm.name in unknown else "")
+            for pm in managers
+        )
+        if unknown:
+            noHistory.append(dependency.name)
+            lines.append(f"{dependency.name}: {order}, duration unknown")
+            continue
+        seconds = history.expected_seconds(dependency.name, managers)
+        total += seconds
+        estimated += 1
+        lines.append(f"{dependency.name}: {order} (~{seconds:.0f}s)")
+    lines.append(
+        f"estimated total: ~{total:.0f}s"
+        if estimated
+        else "estimated total: unknown"
+    )
+    if noHistory:
+        lines.append("no history, unknown: " + ", ".join(noHistory))
+    if customInstall:
+        lines.append(
+            "own installer, not estimated: " + ", ".join(customInstall)
+        )
+    return "\n".join(lines)
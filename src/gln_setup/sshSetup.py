@@ -1,10 +1,129 @@
-from dataclasses import dataclass
+import base64
+import binascii
+import hashlib
+from dataclasses import dataclass, field
 from pathlib import Path
-from subprocess import run
+from subprocess import CalledProcessError, run
 from typing import Optional
 
 from sshconf import empty_ssh_config_file, read_ssh_config
 
+# (directory, config) -> ((directory, config, newest .pub) mtimes, index)
+_index_cache: dict[
+    tuple[Path, Path], tuple[tuple[int, int, int], "KeyIndex"]
+] = {}
+
+
+@dataclass
+class KeyRecord:
+    key_path: Path
+    protocol: str
+    fingerprint: str
+    comment: str = ""
+    hosts: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_pub(cls, pub_path: Path) -> Optional["KeyRecord"]:
+        try:
+            fields = pub_path.read_text().split(maxsplit=2)
+        except (OSError, UnicodeDecodeError):
+            return None
+        if len(fields) < 2:
+            return None
+        try:
+            blob = base64.b64decode(fields[1], validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        digest = base64.b64encode(hashlib.sha256(blob).digest()).decode()
+        return cls(
+            key_path=pub_path.with_suffix(""),
+            protocol=fields[0],
+            fingerprint="SHA256:" + digest.rstrip("="),
+            comment=fields[2].strip() if len(fields) > 2 else "",
+        )
+
+
+@dataclass
+class KeyIndex:
+    ssh_dir: Path = Path("~/.ssh")
+    config_path: Optional[Path] = None
+    keys: list[KeyRecord] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.ssh_dir = self.ssh_dir.expanduser()
+        if self.config_path is None:
+            self.config_path = self.ssh_dir / "config"
+        self.config_path = self.config_path.expanduser()
+        self.__read_keys()
+        self.__read_config()
+
+    @classmethod
+    def load(
+        cls, ssh_dir: Path = Path("~/.ssh"), config_path: Optional[Path] = None
+    ) -> "KeyIndex":
+        """
+        Return the index for ssh_dir, reusing the cached one while neither
+        the directory, the config file nor any public key has changed.
+        """
+        ssh_dir = ssh_dir.expanduser()
+        config_path = (
+            ssh_dir / "config" if config_path is None else config_path
+        ).expanduser()
+        pubs = ssh_dir.glob("*.pub") if ssh_dir.is_dir() else []
+        stamp = (
+            _mtime(ssh_dir),
+            _mtime(config_path),
+            max((_mtime(p) for p in pubs), default=0),
+        )
+        cached = _index_cache.get((ssh_dir, config_path))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        index = cls(ssh_dir, config_path)
+        _index_cache[(ssh_dir, config_path)] = (stamp, index)
+        return index
+
+    def __read_keys(self) -> None:
+        if not self.ssh_dir.is_dir():
+            return
+        for pub in sorted(self.ssh_dir.glob("*.pub")):
+            record = KeyRecord.from_pub(pub)
+            if record is not None:
+                self.keys.append(record)
+
+    def __read_config(self) -> None:
+        if self.config_path is None or not self.config_path.exists():
+            return
+        config = read_ssh_config(self.config_path)
+        byPath = {k.key_path: k for k in self.keys}
+        for host in config.hosts():
+            identities = config.host(host).get("identityfile", [])
+            if isinstance(identities, str):
+                identities = [identities]
+            for identity in identities:
+                record = byPath.get(Path(identity).expanduser())
+                if record is not None and host not in record.hosts:
+                    record.hosts.append(host)
+
+    def find(self, key_path: Path) -> Optional[KeyRecord]:
+        key_path = key_path.expanduser()
+        for record in self.keys:
+            if record.key_path == key_path:
+                return record
+        return None
+
+    def duplicates(self) -> dict[str, list[KeyRecord]]:
+        byFingerprint: dict[str, list[KeyRecord]] = {}
+        for record in self.keys:
+            byFingerprint.setdefault(record.fingerprint, []).append(record)
+        return {f: r for f, r in byFingerprint.items() if len(r) > 1}
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
 
 @dataclass
 class SSHkey:
@@ -26,7 +145,34 @@ class SSHkey:
             self.key_path = Path(f"~/.ssh/id_{self.protocol}_{self.name}")
         self.key_path = self.key_path.expanduser()
 
-    def create(self):
+    def create(self, reuse: bool = False):
+        if reuse and self.key_path is not None and self.key_path.exists():
+            if KeyIndex.load(self.key_path.parent).find(self.key_path) is None:
+                # the private key is there but its .pub is missing or broken
+                try:
+                    public = run(
+                        [
+                            "ssh-keygen",
+                            "-y",
+                            "-P",
+                            self.passphrase,
+                            "-f",
+                            str(self.key_path),
+                        ],
+                        check=True,
+                        text=True,
+                        capture_output=True,
+                    ).stdout
+                except CalledProcessError:
+                    raise ValueError(
+                        f"could not read {self.key_path}, it needs the "
+                        "passphrase (-p) to recreate its public key."
+                    )
+                self.key_path.with_name(
+                    self.key_path.name + ".pub"
+                ).write_text(public)
+            print(f"reusing existing key {self.key_path}")
+            return
         if (
             self.key_path is not None
             and self.key_path.exists()
@@ -0,0 +1,56 @@
+import unittest
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+
+from gln_setup import api
+from gln_setup.sshSetup import SSHkey
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        api.clear_cache()
+        self.tmp = TemporaryDirectory()
+        self.sshDir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        api.clear_cache()
+
+    def testCheckIsMemoized(self):
+        with NamedTemporaryFile() as f:
+            first = api.check(Path(f.name), self.sshDir)
+            self.assertIs(first.git, api.check_git(Path(f.name)))
+            self.assertIs(
+                first.dependencies, api.check(Path(f.name)).dependencies
+            )
+            self.assertFalse(first.git.configured)
+            self.assertFalse(first.ok)
+
+    def testPlanAndApplyGit(self):
+        with NamedTemporaryFile() as f:
+            gitFile = Path(f.name)
+            steps = [
+                s
+                for s in api.plan(api.check(gitFile, self.sshDir))
+                if s.action.startswith("set-git")
+            ]
+            self.assertEqual(
+                [s.target for s in steps], ["user.name", "user.email"]
+            )
+            result = api.apply(steps, gitFile=gitFile)
+            self.assertFalse(result.ok)
+            result = api.apply(
+                steps, "John Doe", "john.doe@whoknows.edu", gitFile
+            )
+            self.assertTrue(result.ok)
+            self.assertTrue(api.check(gitFile, self.sshDir).git.configured)
+
+    def testSSHIsCurrentAndDetached(self):
+        self.assertEqual(api.check_ssh(self.sshDir).keys, ())
+        SSHkey(key_path=self.sshDir / "id_ed25519_fooToBar").create()
+        keys = api.check(sshDir=self.sshDir).ssh.keys
+        self.assertEqual(len(keys), 1)
+        self.assertIsInstance(keys[0].hosts, tuple)
+        with self.assertRaises(FrozenInstanceError):
+            keys[0].hosts = ("elsewhere",)
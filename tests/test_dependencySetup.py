@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory, mkdtemp
+from unittest.mock import patch
+from urllib.error import URLError
+
+from typer.testing import CliRunner
+
+from gln_setup.cli import app
+from gln_setup.dependencySetup import Conda, Rclone, benchmark_backends
+
+
+class TestConda(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.micromamba = Path(self.tmp.name) / "micromamba"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testNoBackend(self):
+        conda = Conda(
+            backends=("micromamba", "not-a-conda"),
+            micromamba_path=self.micromamba,
+        )
+        if shutil.which("micromamba"):
+            self.skipTest("micromamba on PATH")
+        self.assertFalse(conda.is_pm_installed)
+        with self.assertRaises(FileNotFoundError):
+            conda.cmd
+
+    def testPrefersBootstrappedMicromamba(self):
+        self.micromamba.write_text("#!/bin/sh\n")
+        self.micromamba.chmod(0o755)
+        conda = Conda(micromamba_path=self.micromamba)
+        self.assertTrue(conda.is_pm_installed)
+        self.assertEqual(conda.backend, "micromamba")
+        self.assertEqual(conda.solver_args, [])
+        self.assertIn("MAMBA_ROOT_PREFIX", conda.env)
+
+    def testFailedDownloadIsCaught(self):
+        conda = Conda(backends=("not-a-conda",),
+                      micromamba_path=self.micromamba)
+        rclone = Rclone(packageManagers=[conda])
+        with patch(
+            "urllib.request.urlopen", side_effect=URLError("offline")
+        ), patch("shutil.which", return_value=None):
+            with self.assertRaises(FileNotFoundError):
+                conda.install()
+            rclone.install()  # moves on instead of crashing
+        self.assertFalse(self.micromamba.exists())
+        self.assertFalse(
+            self.micromamba.with_name("micromamba.partial").exists()
+        )
+
+    def fakeConda(self, version: str, plugin: bool) -> Conda:
+        binDir = Path(mkdtemp(dir=self.tmp.name))
+        listing = '[{"name": "conda-libmamba-solver"}]' if plugin else "[]"
+        (binDir / "conda").write_text(
+            "#!/bin/sh\n"
+            f'[ "$1" = --version ] && echo "conda {version}" && exit 0\n'
+            f"[ \"$1\" = list ] && echo '{listing}' && exit 0\n"
+            "exit 1\n"
+        )
+        (binDir / "conda").chmod(0o755)
+        oldPath = os.environ["PATH"]
+        os.environ["PATH"] = f"{binDir}{os.pathsep}{oldPath}"
+        self.addCleanup(os.environ.__setitem__, "PATH", oldPath)
+        return Conda(backends=("conda",))
+
+    def testLibmambaRequested(self):
+        conda = self.fakeConda("23.1.0", plugin=True)
+        self.assertEqual(conda.solver_args, ["--solver=libmamba"])
+
+    def testLibmambaPluginMissing(self):
+        conda = self.fakeConda("23.1.0", plugin=False)
+        self.assertEqual(conda.solver_args, [])
+
+    def testLibmambaDefault(self):
+        for version in ("24.1.2", "22.9.0"):
+            with self.subTest(version=version):
+                conda = self.fakeConda(version, plugin=True)
+                self.assertEqual(conda.solver_args, [])
+
+
+# a one package channel so solves need no network
+NOARCH_REPODATA = {
+    "info": {"subdir": "noarch"},
+    "packages": {
+        "glnstub-1.0-0.tar.bz2": {
+            "name": "glnstub",
+            "version": "1.0",
+            "build": "0",
+            "build_number": 0,
+            "depends": [],
+            "subdir": "noarch",
+            "noarch": "generic",
+            "md5": "d41d8cd98f00b204e9800998ecf8427e",
+            "size": 0,
+        }
+    },
+    "packages.conda": {},
+}
+
+
+@unittest.skipUnless(
+    any(shutil.which(b) for b in Conda.backends), "no conda backend"
+)
+class TestCondaBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.channel = Path(self.tmp.name)
+        for subdir in ("noarch", "linux-64", "osx-64", "osx-arm64",
+                       "linux-aarch64"):
+            (self.channel / subdir).mkdir()
+            repodata = (
+                NOARCH_REPODATA
+                if subdir == "noarch"
+                else {"info": {"subdir": subdir}, "packages": {},
+                      "packages.conda": {}}
+            )
+            (self.channel / subdir / "repodata.json").write_text(
+                json.dumps(repodata)
+            )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testLocalChannel(self):
+        times = benchmark_backends(["glnstub"], self.channel.as_uri())
+        self.assertTrue(times)
+        self.assertTrue(all(seconds > 0 for seconds in times.values()))
+        if "conda" in times and len(times) > 1:
+            fastest = min(s for b, s in times.items() if b != "conda")
+            self.assertLess(fastest, times["conda"])
+
+    def testCli(self):
+        result = CliRunner().invoke(
+            app,
+            ["conda-benchmark", "--channel", self.channel.as_uri(),
+             "glnstub"],
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertRegex(result.output, r"(micromamba|mamba|conda): [\d.]+s")
@@ -0,0 +1,41 @@
+import unittest
+
+from typer.testing import CliRunner
+
+from gln_setup.cli import app
+from gln_setup.exportSetup import ExportFormat, Recipe
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def testLayerOrder(self):
+        text = Recipe().render(ExportFormat.dockerfile)
+        system = text.index("apt-get install")
+        uv = text.index("astral.sh/uv/install.sh")
+        gln = text.index("uv tool install")
+        self.assertLess(system, uv)
+        self.assertLess(uv, gln)
+        self.assertEqual(text.count("\nRUN "), 3)
+        self.assertIn("git-annex-remote-rclone", text)
+
+    def testApptainerCli(self):
+        result = self.runner.invoke(
+            app,
+            ["export", "--format", "apptainer", "--source", "gln==1.0"],
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(result.output.startswith("Bootstrap: docker"))
+        self.assertIn("uv tool install --python 3.12 'gln==1.0'",
+                      result.output)
+
+    def testApptainerRejectsPlatform(self):
+        with self.assertRaises(ValueError):
+            Recipe(platform="linux/arm64", source="gln").render(
+                ExportFormat.apptainer
+            )
+
+    def testApptainerRequiresSource(self):
+        with self.assertRaises(ValueError):
+            Recipe().render(ExportFormat.apptainer)
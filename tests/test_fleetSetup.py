@@ -0,0 +1,194 @@
+import json
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from subprocess import DEVNULL, run
+from tempfile import TemporaryDirectory
+
+from gln_setup.fleetSetup import Fleet, read_hostfile, report
+
+# Stands in for ssh: records its argv, then runs the remote command
+# locally, so the fleet can be exercised without an sshd. Hosts named
+# fail* refuse to connect.
+FAKE_SSH = f"""#!{sys.executable}
+import json, os, subprocess, sys
+args = sys.argv[1:]
+with open(os.environ["FAKE_SSH_LOG"], "a") as f:
+    f.write(json.dumps(args) + "\\n")
+if "-O" in args:
+    sys.exit(0)
+host, command = args[-2], args[-1]
+if host.startswith("fail"):
+    print("connection refused", flush=True)
+    sys.exit(255)
+sys.exit(subprocess.run(["sh", "-c", command]).returncode)
+"""
+
+FAKE_GLN_SETUP = f"""#!/bin/sh
+exec {sys.executable} -c "from gln_setup.cli import app; app()" "$@"
+"""
+
+ECHO = """#!/bin/sh
+echo "$(basename "$0") $@"
+"""
+
+OPTIONS = [
+    "-o",
+    "BatchMode=yes",
+    "-o",
+    "ControlMaster=auto",
+    "-o",
+    "ControlPersist=30",
+]
+
+
+def sshd_available() -> bool:
+    if shutil.which("ssh") is None:
+        return False
+    try:
+        return (
+            run(
+                ["ssh", "-o", "BatchMode=yes", "-o", "ConnectTimeout=3",
+                 "localhost", "true"],
+                stdout=DEVNULL,
+                stderr=DEVNULL,
+                timeout=10,
+            ).returncode
+            == 0
+        )
+    except Exception:
+        return False
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.toolDir = self.dir / "tools"
+        self.glnDir = self.dir / "gln"
+        for d, files in [
+            (self.toolDir, [("ssh", FAKE_SSH), ("uv", ECHO), ("uvx", ECHO)]),
+            (self.glnDir, [("gln-setup", FAKE_GLN_SETUP)]),
+        ]:
+            d.mkdir()
+            for name, text in files:
+                (d / name).write_text(text)
+                (d / name).chmod(0o755)
+        self.sshLog = self.dir / "ssh.log"
+        self.oldEnv = dict(os.environ)
+        os.environ["FAKE_SSH_LOG"] = str(self.sshLog)
+        os.environ["HOME"] = str(self.dir)
+        self.setPath(gln=True)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.oldEnv)
+        self.tmp.cleanup()
+
+    def setPath(self, gln: bool):
+        dirs = [self.toolDir] + ([self.glnDir] if gln else [])
+        os.environ["PATH"] = os.pathsep.join(
+            [str(d) for d in dirs] + [self.oldEnv["PATH"]]
+        )
+
+    def fleet(self, hosts: list[str], **kwargs) -> Fleet:
+        return Fleet(
+            hosts,
+            logDir=self.dir / "logs",
+            ssh=[str(self.toolDir / "ssh")],
+            **kwargs,
+        )
+
+    def calls(self) -> list[list[str]]:
+        return [json.loads(line) for line in self.sshLog.read_text().split(
+            "\n") if line]
+
+    def assertRemote(self, argv: list[str], host: str, command: str):
+        self.assertEqual(argv[:6], OPTIONS)
+        self.assertEqual(argv[6], "-o")
+        self.assertTrue(argv[7].startswith("ControlPath="))
+        self.assertTrue(argv[7].endswith("/%C"))
+        self.assertEqual(argv[8:], [host, command])
+
+    def testReadHostfile(self):
+        hostfile = self.dir / "hosts"
+        hostfile.write_text("a@one\n\n# comment\ntwo  # trailing\na@one\n")
+        self.assertEqual(read_hostfile(hostfile), ["a@one", "two"])
+
+    def testRunReportsPerHost(self):
+        fleet = self.fleet(["one", "two", "fail-three"], jobs=2)
+        results = fleet.run(
+            ["export", "--format", "apptainer", "--source", "gln"]
+        )
+        self.assertEqual([r.host for r in results],
+                         ["one", "two", "fail-three"])
+        self.assertEqual([r.ok for r in results], [True, True, False])
+        self.assertEqual(results[2].returncode, 255)
+        self.assertIn("Bootstrap: docker", results[0].log.read_text())
+        self.assertIn("connection refused", results[2].log.read_text())
+        self.assertTrue(report(results).endswith("2 passed, 1 failed"))
+
+    def testExistingInstallArgv(self):
+        fleet = self.fleet(["a@one"])
+        self.assertTrue(fleet.run(["install-deps", "--plan"])[0].ok)
+        probe, command, close = self.calls()
+        self.assertRemote(probe, "a@one", fleet.probe_command())
+        self.assertRemote(
+            command,
+            "a@one",
+            fleet.run_command(["install-deps", "--plan"], True),
+        )
+        self.assertEqual(close[:2], probe[6:8])
+        self.assertEqual(close[2:], ["-O", "exit", "a@one"])
+        # all calls of a host share one control socket
+        self.assertEqual(probe[7], command[7])
+
+    def testUvxFallback(self):
+        if shutil.which("gln-setup", path=self.oldEnv["PATH"]):
+            self.skipTest("gln-setup installed on this machine")
+        self.setPath(gln=False)
+        fleet = self.fleet(["one"], source="gln-setup==1.0")
+        result = fleet.run(["git", "--name", "John Doe"])[0]
+        self.assertTrue(result.ok)
+        self.assertIn(
+            "uvx --from gln-setup==1.0 gln-setup git --name John Doe",
+            result.log.read_text(),
+        )
+        self.assertEqual(
+            fleet.run_command(["git", "--name", "John Doe"], False),
+            'export PATH="$HOME/.local/bin:$HOME/.cargo/bin:$PATH"; '
+            "uvx --from gln-setup==1.0 gln-setup git --name 'John Doe'",
+        )
+
+    def testInstall(self):
+        fleet = self.fleet(["one"], install=True, source="gln-setup==1.0")
+        result = fleet.run(["export", "--source", "gln"])[0]
+        self.assertTrue(result.ok)
+        install, command, _ = self.calls()
+        self.assertRemote(install, "one", fleet.install_command())
+        self.assertTrue(
+            install[-1].endswith("uv tool install --force gln-setup==1.0")
+        )
+        self.assertRemote(
+            command, "one", fleet.run_command(["export", "--source", "gln"],
+                                              True)
+        )
+        self.assertIn("uv tool install --force", result.log.read_text())
+
+    def testFailedInstallSkipsCommand(self):
+        (self.toolDir / "uv").write_text("#!/bin/sh\nexit 3\n")
+        result = self.fleet(["one"], install=True).run(["install-deps"])[0]
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(len(self.calls()), 2)  # install and close only
+
+
+@unittest.skipUnless(sshd_available(), "no passwordless ssh to localhost")
+class TestFleetLocalSshd(unittest.TestCase):
+    def testLocalhost(self):
+        with TemporaryDirectory() as tmp:
+            result = Fleet(["localhost"], logDir=Path(tmp)).run(["--help"])[0]
+            log = result.log.read_text()
+            self.assertNotEqual(result.returncode, 255, log)
+            self.assertIn("command -v gln-setup", log)
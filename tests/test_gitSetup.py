@@ -3,11 +3,18 @@ from pathlib import Path
 from tempfile import NamedTemporaryFile
 from subprocess import run
 from typing import IO
+from unittest.mock import patch
 
 from typer.testing import CliRunner
 
 from gln_setup.cli import app
-from gln_setup.gitSetup import GitInfo
+from gln_setup.gitSetup import (
+    MAX_THREADS,
+    GitInfo,
+    GitProfile,
+    benchmark_status,
+    profile_settings,
+)
 
 
 class TestGitConfig(unittest.TestCase):
@@ -84,3 +91,38 @@ class TestGitConfig(unittest.TestCase):
             self.assertEqual(result2.exit_code, 0)
             self.assertEqual(self.new_name, gi.name)
             self.assertEqual(self.new_email, gi.email)
+
+    def testGitProfileCli(self):
+        with NamedTemporaryFile() as f:
+            result = self.runner.invoke(
+                app,
+                ["git", "--profile", "performance", "--file", f.name],
+            )
+            self.assertEqual(result.exit_code, 0)
+            gi = GitInfo(Path(f.name))
+            self.assertEqual(gi.get("feature.manyFiles"), "true")
+            self.assertEqual(gi.get("annex.jobs"), "cpus")
+            threads = int(gi.get("index.threads") or 0)
+            self.assertTrue(1 <= threads <= MAX_THREADS)
+
+    def testBenchmarkRequiresProfile(self):
+        result = self.runner.invoke(app, ["git", "--benchmark", "10"])
+        self.assertNotEqual(result.exit_code, 0)
+
+    def testNetworkPathUsesSafeSettings(self):
+        with patch(
+            "gln_setup.gitSetup.filesystem_type",
+            lambda path=None: "gpfs" if path is not None else "ext4",
+        ):
+            settings = profile_settings(
+                GitProfile.performance, Path("/gs/gsfs0")
+            )
+        self.assertEqual(settings["core.untrackedCache"], "false")
+        self.assertNotIn("core.fsmonitor", settings)
+
+    def testBenchmarkStatus(self):
+        before, after = benchmark_status(
+            profile_settings(GitProfile.performance), nFiles=50, repeat=1
+        )
+        self.assertGreater(before, 0)
+        self.assertGreater(after, 0)
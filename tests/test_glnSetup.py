@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import sys
+import unittest
+from pathlib import Path
+from subprocess import CalledProcessError, run
+from tempfile import TemporaryDirectory
+
+from typer.testing import CliRunner
+
+from gln_setup.cli import app
+from gln_setup.glnSetup import (
+    InstalledTool,
+    Source,
+    gln_sources,
+    local_head,
+)
+
+# Stand in for git and uv: both record their argv, git also records the
+# GIT_SSH_COMMAND it was given (as "git-ssh"). git ls-remote prints
+# the head of the first FAKE_HEADS key found in the url and fails for any
+# other url. uv fails for any argv containing one of FAKE_UV_FAIL.
+FAKE_GIT = f"""#!{sys.executable}
+import json, os, sys
+with open(os.environ["FAKE_LOG"], "a") as f:
+    f.write(json.dumps(["git"] + sys.argv[1:]) + "\\n")
+    ssh = os.environ.get("GIT_SSH_COMMAND", "")
+    f.write(json.dumps(["git-ssh", ssh]) + "\\n")
+for key, head in json.loads(os.environ["FAKE_HEADS"]).items():
+    if key in sys.argv[2]:
+        print(head + "\\tHEAD")
+        sys.exit(0)
+sys.exit(128)
+"""
+
+FAKE_UV = f"""#!{sys.executable}
+import json, os, sys
+args = sys.argv[1:]
+if args == ["tool", "dir"]:
+    print(os.environ["FAKE_TOOL_DIR"])
+    sys.exit(0)
+with open(os.environ["FAKE_LOG"], "a") as f:
+    f.write(json.dumps(["uv"] + args) + "\\n")
+fail = json.loads(os.environ["FAKE_UV_FAIL"])
+sys.exit(int(any(f in a for f in fail for a in args)))
+"""
+
+GITHUB = gln_sources("jdoe")[-1]
+HPC = gln_sources("jdoe")[0]
+
+
+def add_tool(
+    toolDir: Path, url: str, commit: str, extras: list[str]
+) -> InstalledTool:
+    tool = toolDir / "gln"
+    distInfo = tool / "lib/python3.12/site-packages/gln-0.1.dist-info"
+    distInfo.mkdir(parents=True)
+    (distInfo / "direct_url.json").write_text(
+        json.dumps({"url": url, "vcs_info": {"vcs": "git",
+                                              "commit_id": commit}})
+    )
+    (tool / "uv-receipt.toml").write_text(
+        "[tool]\n"
+        f'requirements = [{{ name = "gln", extras = {json.dumps(extras)}'
+        f', git = "{url}" }}]\n'
+        'python = "3.12"\n'
+    )
+    return InstalledTool(toolDir=toolDir)
+
+
+class TestGlnInstall(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.source = Source(gln_sources()[-1])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def addTool(self, url: str, commit: str, extras: list[str]):
+        return add_tool(self.dir / "tools", url, commit, extras)
+
+    def testSourceParsing(self):
+        self.assertEqual(
+            self.source.url, "ssh://git@github.com/TheRealGambleLab/gln"
+        )
+        self.assertEqual(self.source.extras, ["extensions"])
+        ria = Source(gln_sources()[1])
+        self.assertIn("Gamble Lab", ria.url)
+        self.assertEqual(ria.extras, ["on-hpc-extensions"])
+
+    def testLocalHead(self):
+        repo = self.dir / "repo"
+        run(["git", "init", "-q", "--bare", str(repo)], check=True)
+        self.assertIsNone(local_head(repo))
+        (repo / "packed-refs").write_text(
+            "# pack-refs with: peeled\n"
+            f"{'a' * 40} {(repo / 'HEAD').read_text().split()[1]}\n"
+        )
+        self.assertEqual(local_head(repo), "a" * 40)
+
+    def testAction(self):
+        tool = self.addTool(
+            "ssh://git@github.com/TheRealGambleLab/gln", "abc", ["extensions"]
+        )
+        self.assertEqual(tool.action(self.source, "abc", "3.12"), "skip")
+        self.assertEqual(tool.action(self.source, "def", "3.12"), "upgrade")
+        self.assertEqual(tool.action(self.source, "abc", "3.11"), "install")
+        other = Source(gln_sources()[1])
+        self.assertEqual(tool.action(other, "abc", "3.12"), "install")
+
+    def testNotInstalled(self):
+        tool = InstalledTool(toolDir=self.dir / "tools")
+        self.assertEqual(tool.action(self.source, "abc", "3.12"), "install")
+
+
+class TestGlnInstallCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.bin = self.dir / "bin"
+        self.bin.mkdir()
+        for name, text in [("git", FAKE_GIT), ("uv", FAKE_UV)]:
+            (self.bin / name).write_text(text)
+            (self.bin / name).chmod(0o755)
+        self.log = self.dir / "calls.log"
+        self.oldEnv = dict(os.environ)
+        os.environ["FAKE_LOG"] = str(self.log)
+        os.environ["FAKE_TOOL_DIR"] = str(self.dir / "tools")
+        os.environ["PATH"] = f"{self.bin}{os.pathsep}{self.oldEnv['PATH']}"
+        self.setFake(heads={}, uvFail=[])
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.oldEnv)
+        self.tmp.cleanup()
+
+    def setFake(self, heads: dict[str, str], uvFail: list[str]):
+        os.environ["FAKE_HEADS"] = json.dumps(heads)
+        os.environ["FAKE_UV_FAIL"] = json.dumps(uvFail)
+
+    def installFromGithub(self, commit: str):
+        add_tool(
+            self.dir / "tools", Source(GITHUB).url, commit, ["extensions"]
+        )
+
+    def invoke(self, *args: str):
+        return CliRunner().invoke(app, ["gln-install", "-u", "jdoe", *args])
+
+    def calls(self, program: str) -> list[list[str]]:
+        if not self.log.exists():
+            return []
+        calls = [json.loads(c) for c in self.log.read_text().splitlines()]
+        return [c[1:] for c in calls if c[0] == program]
+
+    def assertTimed(self, output: str, message: str):
+        self.assertRegex(output, re.escape(message) + r" \d+\.\ds\n")
+
+    def testSkipReturnsEarly(self):
+        self.installFromGithub("abc")
+        self.setFake(heads={"github.com": "abc"}, uvFail=[HPC])
+        result = self.invoke()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTimed(
+            result.output, f"gln is up to date (abc) from {GITHUB}, checked in"
+        )
+        # the hpc head is unknown, so it is reinstalled from (and fails)
+        self.assertEqual(
+            self.calls("uv"),
+            [["tool", "install", "--python", "3.12", "--reinstall", HPC]],
+        )
+
+    def testUpgrade(self):
+        self.installFromGithub("abc")
+        self.setFake(heads={"github.com": "def"}, uvFail=[HPC])
+        result = self.invoke()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self.calls("uv")[-1], ["tool", "upgrade", "gln"])
+        self.assertTimed(
+            result.output, f"gln upgraded in place from {GITHUB} in"
+        )
+
+    def testFailedUpgradeFallsBack(self):
+        add_tool(self.dir / "tools", Source(HPC).url, "abc", ["extensions"])
+        self.setFake(
+            heads={"hpc.einsteinmed.edu": "def", "github.com": "def"},
+            uvFail=["upgrade"],
+        )
+        result = self.invoke()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(
+            self.calls("uv"),
+            [
+                ["tool", "upgrade", "gln"],
+                ["tool", "install", "--python", "3.12", GITHUB],
+            ],
+        )
+        self.assertTimed(result.output, f"gln installed from {GITHUB} in")
+
+    def testAbsentSourceSkipped(self):
+        ria = Source(gln_sources()[1])
+        if ria.local_path.exists():
+            self.skipTest("the RIA store is mounted on this machine")
+        self.assertTrue(ria.absent)
+        self.assertFalse(Source(GITHUB).absent)
+        self.setFake(heads={}, uvFail=[HPC])
+        self.invoke()
+        probed = [c[1] for c in self.calls("git")]
+        self.assertEqual(probed, [Source(HPC).url, Source(GITHUB).url])
+        self.assertEqual(
+            self.calls("git-ssh"), [["ssh -o BatchMode=yes"]] * 2
+        )
+        self.assertFalse(any("file://" in a for c in self.calls("uv")
+                             for a in c))
+
+    def testUnknownHeadReinstalls(self):
+        self.installFromGithub("abc")
+        self.setFake(heads={}, uvFail=[HPC])
+        result = self.invoke()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(
+            self.calls("uv")[-1],
+            ["tool", "install", "--python", "3.12", "--reinstall", GITHUB],
+        )
+        self.assertTimed(result.output, f"gln installed from {GITHUB} in")
+
+    def testLastSourceFailureRaises(self):
+        self.setFake(heads={}, uvFail=["tool"])
+        result = self.invoke()
+        self.assertIsInstance(result.exception, CalledProcessError)
+        self.assertEqual(len(self.calls("uv")), 2)
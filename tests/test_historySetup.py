@@ -0,0 +1,101 @@
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from gln_setup.historySetup import History, plan_text
+
+
+@dataclass
+class FakeManager:
+    name: str
+
+
+@dataclass
+class FakeDependency:
+    name: str
+    packageManagers: list
+    is_installed: bool = False
+    custom_install: bool = False
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.json"
+        self.managers = [FakeManager("brew"), FakeManager("conda")]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testNoHistoryKeepsOrder(self):
+        history = History(self.path)
+        self.assertEqual(history.order("git", self.managers), self.managers)
+
+    def testFailingManagerMovesBack(self):
+        history = History(self.path)
+        for _ in range(3):
+            history.record("git", "brew", False, 30.0)
+            history.record("git", "conda", True, 20.0)
+        reloaded = History(self.path)
+        self.assertEqual(
+            [pm.name for pm in reloaded.order("git", self.managers)],
+            ["conda", "brew"],
+        )
+        # other platforms keep their own record
+        other = History(self.path, platform="other")
+        self.assertEqual(other.order("git", self.managers), self.managers)
+
+    def testPlanText(self):
+        history = History(self.path)
+        history.record("git", "brew", True, 10.0)
+        history.record("git", "conda", True, 20.0)
+        history.record("rclone", "brew", True, 10.0)
+        text = plan_text(
+            [
+                FakeDependency("git", self.managers),
+                FakeDependency("rclone", self.managers),
+                FakeDependency("wget", self.managers, True),
+            ],
+            history,
+        )
+        self.assertIn("git: brew -> conda (~", text)
+        self.assertIn(
+            "rclone: brew -> conda (no history), duration unknown", text
+        )
+        self.assertIn("wget: installed", text)
+        self.assertIn("no history, unknown: rclone", text)
+        total = history.expected_seconds("git", self.managers)
+        self.assertIn(f"estimated total: ~{total:.0f}s", text)
+
+    def testEmptyHistoryHasNoNumbers(self):
+        text = plan_text(
+            [FakeDependency(n, self.managers) for n in ("git", "rclone")],
+            History(self.path),
+        )
+        self.assertNotRegex(text, r"\d+s")
+        self.assertIn("estimated total: unknown", text)
+        self.assertIn("no history, unknown: git, rclone", text)
+
+    def testCustomInstallNotEstimated(self):
+        text = plan_text(
+            [FakeDependency("gh", self.managers, custom_install=True)],
+            History(self.path),
+        )
+        self.assertIn("gh: own installer (not estimated)", text)
+        self.assertIn("own installer, not estimated: gh", text)
+
+    def testMalformedHistoryIgnored(self):
+        for text in ('[1, 2]', '{"a": 3}', '{"a": [["x", "y"]]}'):
+            with self.subTest(text=text):
+                self.path.write_text(text)
+                with self.assertWarns(UserWarning):
+                    history = History(self.path)
+                self.assertEqual(history.attempts, {})
+
+    def testUnwritableHistoryWarns(self):
+        self.path.mkdir()  # a directory cannot be written as a file
+        history = History(self.path / "sub")
+        history.path = self.path
+        with self.assertWarns(UserWarning):
+            history.record("git", "brew", True, 1.0)
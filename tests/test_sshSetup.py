@@ -0,0 +1,107 @@
+import os
+import unittest
+from pathlib import Path
+from subprocess import run
+from tempfile import TemporaryDirectory
+
+from typer.testing import CliRunner
+
+from gln_setup.cli import app
+from gln_setup.sshSetup import KeyIndex, SSHkey
+
+
+class TestKeyIndex(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+        self.tmp = TemporaryDirectory()
+        self.sshDir = Path(self.tmp.name)
+        self.key = SSHkey(key_path=self.sshDir / "id_ed25519_fooToBar")
+        self.key.create()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testFingerprintMatchesSshKeygen(self):
+        expected = run(
+            ["ssh-keygen", "-lf", str(self.key.key_path) + ".pub"],
+            check=True,
+            text=True,
+            capture_output=True,
+        ).stdout.split()[1]
+        index = KeyIndex.load(self.sshDir)
+        self.assertEqual(len(index.keys), 1)
+        self.assertEqual(index.keys[0].fingerprint, expected)
+        self.assertEqual(index.keys[0].protocol, "ssh-ed25519")
+
+    def testHostsAndDuplicates(self):
+        self.key.add_to_config(
+            "jdoe@bar.edu", path=self.sshDir / "config"
+        )
+        pub = self.key.key_path.with_suffix(".pub")
+        (self.sshDir / "copy.pub").write_text(pub.read_text())
+        index = KeyIndex.load(self.sshDir)
+        record = index.find(self.key.key_path)
+        self.assertIsNotNone(record)
+        self.assertEqual(record.hosts, ["bar.edu"])
+        self.assertEqual(list(index.duplicates()), [record.fingerprint])
+
+    def testCacheAndReuse(self):
+        index = KeyIndex.load(self.sshDir)
+        self.assertIs(index, KeyIndex.load(self.sshDir))
+        self.key.create(reuse=True)
+        with self.assertRaises(ValueError):
+            self.key.create()
+
+    def testCacheKeyedByConfig(self):
+        other = self.sshDir / "other_config"
+        other.write_text("")
+        self.assertIsNot(
+            KeyIndex.load(self.sshDir, self.sshDir / "config"),
+            KeyIndex.load(self.sshDir, other),
+        )
+
+    def testCacheSeesReplacedPub(self):
+        old = KeyIndex.load(self.sshDir).keys[0].fingerprint
+        pub = self.key.key_path.with_suffix(".pub")
+        with TemporaryDirectory() as tmp:
+            fresh = SSHkey(key_path=Path(tmp) / "id_ed25519_fresh")
+            fresh.create()
+            text = fresh.key_path.with_suffix(".pub").read_text()
+        dirMtime = self.sshDir.stat().st_mtime_ns
+        pub.write_text(text)  # rewritten in place
+        os.utime(self.sshDir, ns=(dirMtime, dirMtime))
+        self.assertNotEqual(KeyIndex.load(self.sshDir).keys[0].fingerprint,
+                            old)
+
+    def testReuseWithoutPub(self):
+        pub = self.key.key_path.with_suffix(".pub")
+        expected = pub.read_text().split()[1]
+        pub.unlink()
+        self.key.create(reuse=True)
+        self.assertEqual(pub.read_text().split()[1], expected)
+
+    def testReuseDottedNameWithoutPub(self):
+        key = SSHkey(key_path=self.sshDir / "id_ed25519_fooTo.hpc")
+        key.create()
+        pub = self.sshDir / "id_ed25519_fooTo.hpc.pub"
+        pub.unlink()
+        key.create(reuse=True)
+        self.assertTrue(pub.exists())
+        self.assertFalse((self.sshDir / "id_ed25519_fooTo.pub").exists())
+        self.assertIsNotNone(KeyIndex.load(self.sshDir).find(key.key_path))
+
+    def testReuseNeedsPassphrase(self):
+        key = SSHkey(
+            key_path=self.sshDir / "id_ed25519_locked", passphrase="secret"
+        )
+        key.create()
+        (self.sshDir / "id_ed25519_locked.pub").unlink()
+        with self.assertRaises(ValueError):
+            SSHkey(key_path=key.key_path).create(reuse=True)
+
+    def testListCli(self):
+        result = self.runner.invoke(
+            app, ["ssh-key-list", "--ssh-dir", str(self.sshDir)]
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("id_ed25519_fooToBar", result.output)